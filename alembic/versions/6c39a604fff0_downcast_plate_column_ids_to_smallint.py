@@ -0,0 +1,35 @@
+"""downcast plate column ids to smallint
+
+Revision ID: 6c39a604fff0
+Revises: 15a7037b391d
+Create Date: 2026-10-16 02:50:27.483037
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c39a604fff0'
+down_revision: Union[str, Sequence[str], None] = '15a7037b391d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: store well column ids as SMALLINT."""
+    # SQLite doesn't support ALTER COLUMN, batch mode recreates the tables
+    with op.batch_alter_table('plate') as batch_op:
+        batch_op.alter_column('column_id', existing_type=sa.Integer(), type_=sa.SmallInteger(), existing_nullable=False)
+    with op.batch_alter_table('plate_experiment_map') as batch_op:
+        batch_op.alter_column('column_id', existing_type=sa.Integer(), type_=sa.SmallInteger(), existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema: restore well column ids to INTEGER."""
+    with op.batch_alter_table('plate_experiment_map') as batch_op:
+        batch_op.alter_column('column_id', existing_type=sa.SmallInteger(), type_=sa.Integer(), existing_nullable=False)
+    with op.batch_alter_table('plate') as batch_op:
+        batch_op.alter_column('column_id', existing_type=sa.SmallInteger(), type_=sa.Integer(), existing_nullable=False)
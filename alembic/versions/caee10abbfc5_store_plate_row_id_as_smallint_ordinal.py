@@ -0,0 +1,34 @@
+"""store plate row_id as smallint ordinal
+
+Revision ID: caee10abbfc5
+Revises: 6c39a604fff0
+Create Date: 2026-10-16 02:51:15.859590
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'caee10abbfc5'
+down_revision: Union[str, Sequence[str], None] = '6c39a604fff0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema: convert row letters to ordinals (A=0, B=1, ...)."""
+    op.execute("UPDATE plate SET row_id = unicode(upper(row_id)) - unicode('A')")
+    
+    with op.batch_alter_table('plate') as batch_op:
+        batch_op.alter_column('row_id', existing_type=sa.String(), type_=sa.SmallInteger(), existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema: convert row ordinals back to letters."""
+    with op.batch_alter_table('plate') as batch_op:
+        batch_op.alter_column('row_id', existing_type=sa.SmallInteger(), type_=sa.String(), existing_nullable=False)
+    
+    op.execute("UPDATE plate SET row_id = char(row_id + unicode('A'))")
@@ -11,6 +11,9 @@ Examples:
     
     # Extract features and save to CSV
     python scripts/extract_features.py 1 1 features_output.csv
+    
+    # Extract features and save to gzip-compressed CSV
+    python scripts/extract_features.py 1 1 features_output.csv.gz
 """
 
 import sys
@@ -20,7 +23,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.services.feature_extractor import FeatureExtractor
+from src.services.feature_extractor import FeatureExtractor, FEATURE_COLS
 
 
 def main():
@@ -58,17 +61,17 @@ def main():
         
         # Display feature statistics
         print(f"\n  Feature Statistics:")
-        feature_stats = df[[f'feature_{i}' for i in range(1, 17)]].describe()
+        feature_stats = df[list(FEATURE_COLS)].describe()
         print(feature_stats.to_string())
         
         # Save to CSV if output file specified
         if output_file:
-            df.to_csv(output_file, index=False)
+            df.to_csv(output_file, index=False, chunksize=50_000)
             print(f"\n✓ Saved features to: {output_file}")
         else:
             # Default output file
             default_file = f"features_exp{experiment_id}_plate{plate_id}.csv"
-            df.to_csv(default_file, index=False)
+            df.to_csv(default_file, index=False, chunksize=50_000)
             print(f"\n✓ Saved features to: {default_file}")
         
     except Exception as e:
@@ -148,7 +148,7 @@ Synthesize the information across all organisms, noting similarities and differe
             self.logger.info(f"Generated {len(literature_text)} characters of research")
             
             # Cache the successful response
-            repository.create(organisms_key, literature_text)
+            repository.upsert(organisms_key, literature_text)
             self.logger.info(f"Cached literature for organisms: {organisms_key}")
             
             return literature_text
@@ -61,7 +61,7 @@ class FutureHouseAPI:
             # Cache the successful response
             if responses[0].status == "completed" and hasattr(responses[0], 'answer'):
                 literature_text = responses[0].answer
-                repository.create(organisms_key, literature_text)
+                repository.upsert(organisms_key, literature_text)
                 self.logger.info(f"Cached literature for organisms: {organisms_key}")
                 return literature_text
             
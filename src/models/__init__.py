@@ -9,6 +9,7 @@ from .reagent import Reagent
 from .experiment import Experiment
 from .reagent_values import ReagentValue
 from .plate import Plate
+from .plate_ingest import PlateIngest
 from .plate_experiment_map import PlateExperimentMap
 from .future_house_literature import FutureHouseLiterature
 from .related_organisms import RelatedOrganisms
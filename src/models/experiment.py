@@ -16,6 +16,8 @@ class Experiment(Base):
     dilution: Mapped[float] = mapped_column(Float, nullable=False)
     
     # Relationships
-    reagent_values: Mapped[list["ReagentValue"]] = relationship("ReagentValue", back_populates="experiment")
+    reagent_values: Mapped[list["ReagentValue"]] = relationship(
+        "ReagentValue", back_populates="experiment", order_by="ReagentValue.reagent_id"
+    )
     plate_experiment_maps: Mapped[list["PlateExperimentMap"]] = relationship("PlateExperimentMap", back_populates="experiment")
 
@@ -1,18 +1,29 @@
-from sqlalchemy import Integer, Float, String, DateTime
+from sqlalchemy import Integer, SmallInteger, Float, Index
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy.sql import func
-from datetime import datetime
 from . import Base
 
+
+def row_letter_to_id(row_letter: str) -> int:
+    """Convert a plate row letter to its ordinal: "A" -> 0, "B" -> 1, ..."""
+    return ord(row_letter.strip().upper()) - ord('A')
+
+
 class Plate(Base):
     """Plate model for storing plate measurements"""
     __tablename__ = "plate"
+    __table_args__ = (
+        # Every read path filters on plate_id, most also on the time sample
+        Index("ix_plate_plate_id_time", "plate_id", "seconds_time_sample"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     plate_id: Mapped[int] = mapped_column(Integer, nullable=False)
-    row_id: Mapped[str] = mapped_column(String, nullable=False)
-    column_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    row_id: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    column_id: Mapped[int] = mapped_column(SmallInteger, nullable=False)
     value: Mapped[float] = mapped_column(Float, nullable=False)
     seconds_time_sample: Mapped[int] = mapped_column(Integer, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
-
+    
+    @property
+    def row_letter(self) -> str:
+        """Row letter for display: 0 -> "A", 1 -> "B", ..."""
+        return chr(ord('A') + self.row_id)
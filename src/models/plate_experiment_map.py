@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, ForeignKey
+from sqlalchemy import Integer, SmallInteger, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import TYPE_CHECKING
 from . import Base
@@ -11,7 +11,7 @@ class PlateExperimentMap(Base):
     __tablename__ = "plate_experiment_map"
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    column_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    column_id: Mapped[int] = mapped_column(SmallInteger, nullable=False)
     experiment_id: Mapped[int] = mapped_column(Integer, ForeignKey("experiment.id"), nullable=False)
     
     # Relationship
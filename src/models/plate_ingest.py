@@ -0,0 +1,15 @@
+from sqlalchemy import Integer, String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from datetime import datetime
+from . import Base
+
+class PlateIngest(Base):
+    """One record per ingested plate file, replaces per-measurement timestamps"""
+    __tablename__ = "plate_ingest"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    plate_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    file_name: Mapped[str] = mapped_column(String, nullable=False)
+    num_records: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
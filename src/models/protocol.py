@@ -18,7 +18,7 @@ class Protocol(Base):
     reagent_name: Mapped[str] = mapped_column(String, nullable=False)
     concentration: Mapped[str | None] = mapped_column(String, nullable=True)
     unit: Mapped[str] = mapped_column(String, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
     
     # Relationships
     protocol_tracker: Mapped["ProtocolTracker"] = relationship("ProtocolTracker", back_populates="protocols")
@@ -15,7 +15,7 @@ class ProtocolTracker(Base):
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     target_organism: Mapped[str] = mapped_column(String, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
     
     # Relationships
     protocols: Mapped[list["Protocol"]] = relationship("Protocol", back_populates="protocol_tracker")
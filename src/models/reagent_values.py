@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, Float, ForeignKey, String
+from sqlalchemy import Integer, Float, ForeignKey, String, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import TYPE_CHECKING
 from . import Base
@@ -10,6 +10,10 @@ if TYPE_CHECKING:
 class ReagentValue(Base):
     """Reagent values for experiments"""
     __tablename__ = "reagent_values"
+    __table_args__ = (
+        # Reagent values are read per experiment, in reagent order
+        Index("ix_reagent_values_experiment_reagent", "experiment_id", "reagent_id"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     experiment_id: Mapped[int] = mapped_column(Integer, ForeignKey("experiment.id"), nullable=False)
@@ -1,4 +1,5 @@
 from .plate_repository import PlateRepository
+from .plate_ingest_repository import PlateIngestRepository
 from .experiment_repository import ExperimentRepository
 from .reagent_value_repository import ReagentValueRepository
 from .reagent_repository import ReagentRepository
@@ -9,6 +10,7 @@ from .protocol_repository import ProtocolRepository
 
 __all__ = [
     'PlateRepository', 
+    'PlateIngestRepository', 
     'ExperimentRepository', 
     'ReagentValueRepository', 
     'ReagentRepository', 
@@ -1,7 +1,9 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+from typing import Dict, Iterable, List, Optional
 
 from src.models.experiment import Experiment
+from src.models.reagent_values import ReagentValue
 
 
 class ExperimentRepository:
@@ -23,11 +25,60 @@ class ExperimentRepository:
     
     def get_by_id(self, experiment_id: int) -> Optional[Experiment]:
         """Get an experiment by ID"""
-        return self.session.query(Experiment).filter(Experiment.id == experiment_id).first()
+        return self.session.scalars(select(Experiment).where(Experiment.id == experiment_id)).first()
+    
+    def get_with_reagent_values(self, experiment_id: int) -> Optional[Experiment]:
+        """Get an experiment by ID with its reagent values loaded in the same query"""
+        return self.session.scalars(
+            select(Experiment)
+            .options(joinedload(Experiment.reagent_values))
+            .where(Experiment.id == experiment_id)
+        ).unique().first()
+    
+    def get_with_reagent_values_by_ids(self, experiment_ids: Iterable[int]) -> List[Experiment]:
+        """Get several experiments by ID with their reagent values loaded in the same query"""
+        return self.session.scalars(
+            select(Experiment)
+            .options(joinedload(Experiment.reagent_values))
+            .where(Experiment.id.in_(set(experiment_ids)))
+        ).unique().all()
+    
+    def get_parameters_by_ids(self, experiment_ids: Iterable[int]) -> Dict[int, tuple]:
+        """
+        Get the parameters and reagent values of several experiments as plain
+        tuples, without loading ORM objects
+        
+        Returns:
+            Dictionary mapping experiment ID to (cell_concentration, dilution,
+            ((reagent_id, value), ...)) with reagent values ordered by reagent_id
+        """
+        rows = self.session.execute(
+            select(
+                Experiment.id,
+                Experiment.cell_concentration,
+                Experiment.dilution,
+                ReagentValue.reagent_id,
+                ReagentValue.value
+            )
+            .outerjoin(ReagentValue, ReagentValue.experiment_id == Experiment.id)
+            .where(Experiment.id.in_(set(experiment_ids)))
+            .order_by(Experiment.id, ReagentValue.reagent_id, ReagentValue.id)
+        ).tuples().all()
+        
+        parameters = {}
+        for experiment_id, cell_concentration, dilution, reagent_id, value in rows:
+            if experiment_id not in parameters:
+                parameters[experiment_id] = (cell_concentration, dilution, [])
+            if reagent_id is not None:
+                parameters[experiment_id][2].append((reagent_id, value))
+        return {
+            experiment_id: (cell_concentration, dilution, tuple(reagent_values))
+            for experiment_id, (cell_concentration, dilution, reagent_values) in parameters.items()
+        }
     
     def get_all(self) -> List[Experiment]:
         """Get all experiments"""
-        return self.session.query(Experiment).all()
+        return self.session.scalars(select(Experiment)).all()
     
     def delete(self, experiment_id: int) -> bool:
         """Delete an experiment"""
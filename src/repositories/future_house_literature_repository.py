@@ -1,4 +1,6 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.sqlite import insert
 from typing import Optional
 
 from src.models.future_house_literature import FutureHouseLiterature
@@ -12,8 +14,10 @@ class FutureHouseLiteratureRepository:
     
     def get_by_organisms(self, organisms_key: str) -> Optional[FutureHouseLiterature]:
         """Get cached literature by organisms key"""
-        return self.session.query(FutureHouseLiterature).filter(
-            FutureHouseLiterature.organisms == organisms_key
+        return self.session.scalars(
+            select(FutureHouseLiterature).where(
+                FutureHouseLiterature.organisms == organisms_key
+            )
         ).first()
     
     def create(self, organisms_key: str, literature: str) -> FutureHouseLiterature:
@@ -26,4 +30,20 @@ class FutureHouseLiteratureRepository:
         self.session.commit()
         self.session.refresh(entry)
         return entry
-
+    
+    def upsert(self, organisms_key: str, literature: str) -> FutureHouseLiterature:
+        """
+        Insert a literature cache entry in a single statement.
+        
+        If another worker already cached this key the existing entry is kept
+        and returned instead of raising an IntegrityError.
+        """
+        stmt = insert(FutureHouseLiterature).values(
+            organisms=organisms_key,
+            literature=literature
+        ).on_conflict_do_nothing(
+            index_elements=[FutureHouseLiterature.organisms]
+        ).returning(FutureHouseLiterature)
+        entry = self.session.scalars(stmt).first()
+        self.session.commit()
+        return entry or self.get_by_organisms(organisms_key)
@@ -0,0 +1,49 @@
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List
+
+from src.models.plate_ingest import PlateIngest
+
+
+class PlateIngestRepository:
+    """Repository for managing PlateIngest data operations"""
+    
+    def __init__(self, session: Session):
+        self.session = session
+    
+    def create(self, plate_id: int, file_name: str, num_records: int, commit: bool = True) -> PlateIngest:
+        """
+        Create a new plate ingest record
+        
+        Args:
+            commit: Commit after inserting; pass False to leave the transaction to the caller
+        """
+        plate_ingest = PlateIngest(
+            plate_id=plate_id,
+            file_name=file_name,
+            num_records=num_records
+        )
+        self.session.add(plate_ingest)
+        if commit:
+            self.session.commit()
+            self.session.refresh(plate_ingest)
+        else:
+            self.session.flush()
+        return plate_ingest
+    
+    def get_by_plate_id(self, plate_id: int) -> List[PlateIngest]:
+        """Get all ingest records for a specific plate"""
+        return self.session.scalars(
+            select(PlateIngest).where(
+                PlateIngest.plate_id == plate_id
+            ).order_by(PlateIngest.created_at)
+        ).all()
+    
+    def get_latest_ids(self, plate_ids: Iterable[int]) -> Dict[int, int]:
+        """Get the ID of the most recent ingest record for each of several plates, keyed by plate ID"""
+        rows = self.session.execute(
+            select(PlateIngest.plate_id, func.max(PlateIngest.id))
+            .where(PlateIngest.plate_id.in_(set(plate_ids)))
+            .group_by(PlateIngest.plate_id)
+        )
+        return dict(rows.tuples().all())
@@ -1,6 +1,9 @@
+from sqlalchemy import select, delete, insert, func
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
+from itertools import islice
 from datetime import datetime
+import numpy as np
 
 from src.models.plate import Plate
 
@@ -14,7 +17,7 @@ class PlateRepository:
     def create(
         self, 
         plate_id: int, 
-        row_id: str, 
+        row_id: int, 
         column_id: int, 
         value: float,
         seconds_time_sample: int
@@ -32,49 +35,157 @@ class PlateRepository:
         self.session.refresh(plate)
         return plate
     
-    def bulk_create(self, plates_data: List[dict]) -> int:
+    def bulk_create(self, plates_data: Iterable[dict], commit: bool = True, batch_size: int = 10_000) -> int:
         """
         Bulk create plate records
         
+        Rows are sent as executemany INSERTs of batch_size rows without building
+        Plate objects, so a generator of records is never fully materialized.
+        
+        Args:
+            plates_data: Dicts with plate_id, row_id, column_id, value and seconds_time_sample
+            commit: Commit after inserting; pass False to leave the transaction to the caller
+            batch_size: Number of rows per executemany
+        
         Returns:
             Number of records inserted
         """
-        plates = [
-            Plate(
-                plate_id=data['plate_id'],
-                row_id=data['row_id'],
-                column_id=data['column_id'],
-                value=data['value'],
-                seconds_time_sample=data['seconds_time_sample']
-            )
-            for data in plates_data
-        ]
-        self.session.bulk_save_objects(plates)
-        self.session.commit()
-        return len(plates)
+        count = 0
+        plates_iter = iter(plates_data)
+        while batch := list(islice(plates_iter, batch_size)):
+            self.session.execute(insert(Plate), batch)
+            count += len(batch)
+        if commit:
+            self.session.commit()
+        return count
+    
+    def bulk_create_columns(
+        self,
+        plate_id: int,
+        row_id: np.ndarray,
+        column_id: np.ndarray,
+        value: np.ndarray,
+        seconds_time_sample: np.ndarray,
+        commit: bool = True,
+        batch_size: int = 10_000
+    ) -> int:
+        """
+        Bulk create plate records for one plate from column arrays
+        
+        Element i of each array makes up the i-th record. Arrays are sliced into
+        executemany batches of batch_size rows, so parameter dicts only exist
+        for one batch at a time.
+        
+        Returns:
+            Number of records inserted
+        """
+        count = len(value)
+        for start in range(0, count, batch_size):
+            stop = start + batch_size
+            self.session.execute(insert(Plate), [
+                {
+                    'plate_id': plate_id,
+                    'row_id': row,
+                    'column_id': column,
+                    'value': val,
+                    'seconds_time_sample': time
+                }
+                for row, column, val, time in zip(
+                    row_id[start:stop].tolist(),
+                    column_id[start:stop].tolist(),
+                    value[start:stop].tolist(),
+                    seconds_time_sample[start:stop].tolist()
+                )
+            ])
+        if commit:
+            self.session.commit()
+        return count
     
     def get_by_plate_id(self, plate_id: int) -> List[Plate]:
         """Get all records for a specific plate"""
-        return self.session.query(Plate).filter(Plate.plate_id == plate_id).all()
+        return self.session.scalars(select(Plate).where(Plate.plate_id == plate_id)).all()
+    
+    def get_columns_by_plate_id(self, plate_id: int) -> List[tuple]:
+        """
+        Get all records for a specific plate as plain row tuples, in insertion order
+        
+        Returns:
+            Tuples of (plate_id, row_id, column_id, value, seconds_time_sample)
+        """
+        return self.session.execute(
+            select(
+                Plate.plate_id,
+                Plate.row_id,
+                Plate.column_id,
+                Plate.value,
+                Plate.seconds_time_sample
+            ).where(Plate.plate_id == plate_id).order_by(Plate.id)
+        ).tuples().all()
+    
+    def get_columns_by_plate_ids(self, plate_ids: Iterable[int]) -> List[tuple]:
+        """
+        Get all records for several plates as plain row tuples, grouped by plate
+        and in insertion order within each plate
+        
+        Returns:
+            Tuples of (plate_id, row_id, column_id, value, seconds_time_sample)
+        """
+        return self.session.execute(
+            select(
+                Plate.plate_id,
+                Plate.row_id,
+                Plate.column_id,
+                Plate.value,
+                Plate.seconds_time_sample
+            ).where(Plate.plate_id.in_(set(plate_ids))).order_by(Plate.plate_id, Plate.id)
+        ).tuples().all()
+    
+    def get_row_stats_by_plate_ids(self, plate_ids: Iterable[int]) -> Dict[int, tuple]:
+        """
+        Get (count, min id, max id) of the records of several plates, keyed by plate ID
+        
+        Plates without records are left out. Served from the plate_id index.
+        """
+        rows = self.session.execute(
+            select(Plate.plate_id, func.count(), func.min(Plate.id), func.max(Plate.id))
+            .where(Plate.plate_id.in_(set(plate_ids)))
+            .group_by(Plate.plate_id)
+        ).tuples().all()
+        return {plate_id: (count, min_id, max_id) for plate_id, count, min_id, max_id in rows}
+    
+    def count_by_plate_id(self, plate_id: int) -> int:
+        """Count the records for a specific plate"""
+        return self.session.scalar(
+            select(func.count()).select_from(Plate).where(Plate.plate_id == plate_id)
+        )
     
     def get_by_plate_and_time(self, plate_id: int, seconds_time_sample: int) -> List[Plate]:
         """Get all records for a specific plate at a specific time"""
-        return self.session.query(Plate).filter(
-            Plate.plate_id == plate_id,
-            Plate.seconds_time_sample == seconds_time_sample
+        return self.session.scalars(
+            select(Plate).where(
+                Plate.plate_id == plate_id,
+                Plate.seconds_time_sample == seconds_time_sample
+            )
         ).all()
     
-    def get_by_well(self, plate_id: int, row_id: str, column_id: int) -> List[Plate]:
-        """Get all time series records for a specific well"""
-        return self.session.query(Plate).filter(
-            Plate.plate_id == plate_id,
-            Plate.row_id == row_id,
-            Plate.column_id == column_id
-        ).order_by(Plate.seconds_time_sample).all()
+    def get_by_well(self, plate_id: int, row_id: int, column_id: int) -> List[Plate]:
+        """
+        Get all time series records for a specific well
+        
+        Args:
+            row_id: Row ordinal (A=0, B=1, ...), see row_letter_to_id
+        """
+        return self.session.scalars(
+            select(Plate).where(
+                Plate.plate_id == plate_id,
+                Plate.row_id == row_id,
+                Plate.column_id == column_id
+            ).order_by(Plate.seconds_time_sample)
+        ).all()
     
     def delete_by_plate_id(self, plate_id: int) -> int:
         """Delete all records for a specific plate"""
-        count = self.session.query(Plate).filter(Plate.plate_id == plate_id).delete()
+        count = self.session.execute(delete(Plate).where(Plate.plate_id == plate_id)).rowcount
         self.session.commit()
         return count
 
@@ -1,3 +1,4 @@
+from sqlalchemy import select, delete
 from sqlalchemy.orm import Session
 from typing import Optional, List
 
@@ -12,14 +13,18 @@ class ProtocolRepository:
     
     def get_by_id(self, protocol_id: int) -> Optional[Protocol]:
         """Get a protocol entry by ID"""
-        return self.session.query(Protocol).filter(
-            Protocol.id == protocol_id
+        return self.session.scalars(
+            select(Protocol).where(
+                Protocol.id == protocol_id
+            )
         ).first()
     
     def get_by_tracker_id(self, tracker_id: int) -> List[Protocol]:
         """Get all protocol entries for a specific tracker"""
-        return self.session.query(Protocol).filter(
-            Protocol.protocol_id == tracker_id
+        return self.session.scalars(
+            select(Protocol).where(
+                Protocol.protocol_id == tracker_id
+            )
         ).all()
     
     def create(
@@ -81,9 +86,11 @@ class ProtocolRepository:
         Returns:
             Number of deleted entries
         """
-        deleted_count = self.session.query(Protocol).filter(
-            Protocol.protocol_id == protocol_id
-        ).delete()
+        deleted_count = self.session.execute(
+            delete(Protocol).where(
+                Protocol.protocol_id == protocol_id
+            )
+        ).rowcount
         self.session.commit()
         return deleted_count
     
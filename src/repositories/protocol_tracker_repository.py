@@ -1,3 +1,4 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import Optional, List
 
@@ -12,18 +13,22 @@ class ProtocolTrackerRepository:
     
     def get_by_id(self, tracker_id: int) -> Optional[ProtocolTracker]:
         """Get a protocol tracker by ID"""
-        return self.session.query(ProtocolTracker).filter(
-            ProtocolTracker.id == tracker_id
+        return self.session.scalars(
+            select(ProtocolTracker).where(
+                ProtocolTracker.id == tracker_id
+            )
         ).first()
     
     def get_all(self) -> List[ProtocolTracker]:
         """Get all protocol trackers"""
-        return self.session.query(ProtocolTracker).all()
+        return self.session.scalars(select(ProtocolTracker)).all()
     
     def get_by_organism(self, target_organism: str) -> List[ProtocolTracker]:
         """Get all protocol trackers for a specific organism"""
-        return self.session.query(ProtocolTracker).filter(
-            ProtocolTracker.target_organism == target_organism
+        return self.session.scalars(
+            select(ProtocolTracker).where(
+                ProtocolTracker.target_organism == target_organism
+            )
         ).all()
     
     def create(self, target_organism: str) -> ProtocolTracker:
@@ -36,6 +41,5 @@ class ProtocolTrackerRepository:
     
     def get_distinct_organisms(self) -> List[str]:
         """Get a distinct list of all organisms in the tracker"""
-        result = self.session.query(ProtocolTracker.target_organism).distinct().all()
-        return [row[0] for row in result]
+        return self.session.scalars(select(ProtocolTracker.target_organism).distinct()).all()
 
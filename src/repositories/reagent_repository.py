@@ -1,5 +1,6 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from src.models.reagent import Reagent
 
@@ -12,13 +13,20 @@ class ReagentRepository:
     
     def get_by_name(self, name: str) -> Optional[Reagent]:
         """Get a reagent by name"""
-        return self.session.query(Reagent).filter(Reagent.name == name).first()
+        return self.session.scalars(select(Reagent).where(Reagent.name == name)).first()
+    
+    def get_ids_by_names(self, names: List[str]) -> Dict[str, int]:
+        """Get reagent IDs for several names in one query, keyed by name"""
+        if not names:
+            return {}
+        rows = self.session.execute(select(Reagent.name, Reagent.id).where(Reagent.name.in_(names)))
+        return dict(rows.tuples().all())
     
     def get_by_id(self, reagent_id: int) -> Optional[Reagent]:
         """Get a reagent by ID"""
-        return self.session.query(Reagent).filter(Reagent.id == reagent_id).first()
+        return self.session.scalars(select(Reagent).where(Reagent.id == reagent_id)).first()
     
     def get_all(self) -> List[Reagent]:
         """Get all reagents"""
-        return self.session.query(Reagent).all()
+        return self.session.scalars(select(Reagent)).all()
 
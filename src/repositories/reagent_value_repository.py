@@ -1,3 +1,4 @@
+from sqlalchemy import select, delete
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
@@ -50,22 +51,28 @@ class ReagentValueRepository:
         return len(reagent_values)
     
     def get_by_experiment_id(self, experiment_id: int) -> List[ReagentValue]:
-        """Get all reagent values for an experiment"""
-        return self.session.query(ReagentValue).filter(
-            ReagentValue.experiment_id == experiment_id
+        """Get all reagent values for an experiment, ordered by reagent_id"""
+        return self.session.scalars(
+            select(ReagentValue).where(
+                ReagentValue.experiment_id == experiment_id
+            ).order_by(ReagentValue.reagent_id)
         ).all()
     
     def get_by_reagent_id(self, reagent_id: int) -> List[ReagentValue]:
         """Get all reagent values for a specific reagent"""
-        return self.session.query(ReagentValue).filter(
-            ReagentValue.reagent_id == reagent_id
+        return self.session.scalars(
+            select(ReagentValue).where(
+                ReagentValue.reagent_id == reagent_id
+            )
         ).all()
     
     def delete_by_experiment_id(self, experiment_id: int) -> int:
         """Delete all reagent values for an experiment"""
-        count = self.session.query(ReagentValue).filter(
-            ReagentValue.experiment_id == experiment_id
-        ).delete()
+        count = self.session.execute(
+            delete(ReagentValue).where(
+                ReagentValue.experiment_id == experiment_id
+            )
+        ).rowcount
         self.session.commit()
         return count
 
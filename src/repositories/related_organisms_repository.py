@@ -1,4 +1,6 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.sqlite import insert
 from typing import Optional
 
 from src.models.related_organisms import RelatedOrganisms
@@ -12,8 +14,10 @@ class RelatedOrganismsRepository:
     
     def get_by_organism(self, organism: str) -> Optional[RelatedOrganisms]:
         """Get cached related organisms by organism name"""
-        return self.session.query(RelatedOrganisms).filter(
-            RelatedOrganisms.organism == organism.lower().strip()
+        return self.session.scalars(
+            select(RelatedOrganisms).where(
+                RelatedOrganisms.organism == organism.lower().strip()
+            )
         ).first()
     
     def create(self, organism: str, related_organisms: str) -> RelatedOrganisms:
@@ -26,4 +30,20 @@ class RelatedOrganismsRepository:
         self.session.commit()
         self.session.refresh(entry)
         return entry
-
+    
+    def upsert(self, organism: str, related_organisms: str) -> RelatedOrganisms:
+        """
+        Insert a related organisms cache entry in a single statement.
+        
+        If another worker already cached this organism the existing entry is
+        kept and returned instead of raising an IntegrityError.
+        """
+        stmt = insert(RelatedOrganisms).values(
+            organism=organism.lower().strip(),
+            related_organisms=related_organisms
+        ).on_conflict_do_nothing(
+            index_elements=[RelatedOrganisms.organism]
+        ).returning(RelatedOrganisms)
+        entry = self.session.scalars(stmt).first()
+        self.session.commit()
+        return entry or self.get_by_organism(organism)
@@ -1,20 +1,37 @@
 import csv
+import os
 import re
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Optional
-from sqlalchemy import create_engine
+from typing import Iterable, Iterator, List, Dict, Optional
+import numpy as np
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from sqlalchemy.orm import Session, sessionmaker
 
+from src.services.database import create_etl_engine
+from src.models.plate import row_letter_to_id
 from src.repositories.plate_repository import PlateRepository
+from src.repositories.plate_ingest_repository import PlateIngestRepository
+
+_PLATE_ID_RE = re.compile(r'plate_(\d+)')
+_WELL_RE = re.compile(r'([A-H])(\d+)')
 
 
 class AbsorbanceETL:
     """ETL script to ingest absorbance plate data from CSV files"""
     
-    def __init__(self, database_url: str = "sqlite:///./database.db"):
-        """Initialize ETL with database connection"""
-        self.engine = create_engine(database_url)
+    def __init__(self, database_url: str = "sqlite:///./database.db", max_workers: Optional[int] = None):
+        """
+        Initialize ETL with database connection
+        
+        Args:
+            database_url: Database URL
+            max_workers: Number of threads used by ingest_directory (default: CPU count)
+        """
+        self.engine = create_etl_engine(database_url)
         self.SessionLocal = sessionmaker(bind=self.engine)
+        self.max_workers = max_workers or os.cpu_count()
     
     @staticmethod
     def parse_plate_id_from_filename(filename: str) -> Optional[int]:
@@ -23,137 +40,233 @@ class AbsorbanceETL:
         
         Example: plate_1_abs.csv -> 1
         """
-        match = re.search(r'plate_(\d+)', filename)
+        match = _PLATE_ID_RE.search(filename)
         if match:
             return int(match.group(1))
         return None
     
     @staticmethod
-    def parse_well_identifier(well_str: str) -> tuple[str, int]:
+    @lru_cache(maxsize=128)
+    def parse_well_identifier(well_str: str) -> tuple[int, int]:
         """
         Parse well identifier into row_id and column_id.
         
-        Example: "A1" -> ("A", 1), "H12" -> ("H", 12)
+        Results are memoized: every plate file repeats the same 96 well headers.
+        
+        Example: "A1" -> (0, 1), "H12" -> (7, 12)
         
         Args:
             well_str: Well identifier like "A1", "B3", "H12"
         
         Returns:
-            Tuple of (row_id, column_id)
+            Tuple of (row_id, column_id) where row_id is the row ordinal (A=0)
         """
-        match = re.match(r'([A-H])(\d+)', well_str)
+        match = _WELL_RE.match(well_str)
         if match:
-            row_id = match.group(1)
+            row_id = row_letter_to_id(match.group(1))
             column_id = int(match.group(2))
             return (row_id, column_id)
         raise ValueError(f"Invalid well identifier: {well_str}")
     
-    def parse_csv_file(self, file_path: Path) -> List[Dict]:
+    def iter_plate_chunks(self, file_path: Path, plate_id: Optional[int] = None, chunk_rows: int = 1000) -> Iterator[Dict]:
         """
-        Parse CSV file and extract plate data.
+        Stream plate data from a CSV file, converting chunk_rows time points at a time.
         
         The CSV format has:
         - Row 1: Header with well identifiers (A1, A2, ..., H12)
         - Subsequent rows: First column is time in seconds, remaining columns are absorbance values
         
+        Rows are read one at a time and reading stops at the first row whose
+        time isn't a number, so trailing metadata is never parsed.
+        
         Args:
             file_path: Path to CSV file
+            plate_id: Plate ID, if already known; parsed from the filename otherwise
+            chunk_rows: Number of time points converted per chunk
         
-        Returns:
-            List of dictionaries containing plate_id, row_id, column_id, value, and seconds_time_sample
+        Yields:
+            Column arrays for each chunk, see parse_csv_file
         """
         # Extract plate_id from filename
-        plate_id = self.parse_plate_id_from_filename(file_path.name)
+        if plate_id is None:
+            plate_id = self.parse_plate_id_from_filename(file_path.name)
         if plate_id is None:
             raise ValueError(f"Could not parse plate_id from filename: {file_path.name}")
         
-        plate_data = []
-        
-        with open(file_path, 'r') as csvfile:
+        with open(file_path, 'r', newline='') as csvfile:
             reader = csv.reader(csvfile)
-            rows = list(reader)
-            
-            if len(rows) < 2:
-                raise ValueError(f"CSV file has fewer than 2 rows: {file_path.name}")
-            
-            # Parse header row (row 0) to get well identifiers
-            header = rows[0]
-            well_identifiers = []
+            header = next(reader, [])
             
+            # Parse header row to get well identifiers
             # Skip first column (empty or time label), parse remaining columns
+            col_idxs = []
+            row_ids = []
+            column_ids = []
             for col_idx in range(1, len(header)):
                 well_str = header[col_idx].strip()
                 if well_str:  # Only process non-empty headers
                     try:
                         row_id, column_id = self.parse_well_identifier(well_str)
-                        well_identifiers.append((col_idx, row_id, column_id))
                     except ValueError:
                         # Skip invalid well identifiers
                         continue
+                    col_idxs.append(col_idx)
+                    row_ids.append(row_id)
+                    column_ids.append(column_id)
+            row_ids = np.array(row_ids, dtype=np.int64)
+            column_ids = np.array(column_ids, dtype=np.int64)
+            last_col_idx = col_idxs[-1] if col_idxs else 0
             
-            # Process data rows
-            # Stop when we hit empty rows or rows that don't start with a number
-            for row_idx in range(1, len(rows)):
-                row = rows[row_idx]
+            has_rows = False
+            times = []
+            cells = []
+            for row in reader:
+                has_rows = True
                 
                 # Skip empty rows or rows without time data
                 if not row or not row[0].strip():
                     continue
                 
-                # Try to parse the first column as time (seconds)
+                # Stop processing when we hit non-numeric time values
                 try:
-                    seconds_time_sample = int(float(row[0].strip()))
-                except (ValueError, IndexError):
-                    # Stop processing when we hit non-numeric time values
+                    times.append(int(float(row[0])))
+                except ValueError:
                     break
                 
-                # Process each well's absorbance value
-                for col_idx, row_id, column_id in well_identifiers:
-                    if col_idx < len(row):
-                        value_str = row[col_idx].strip()
-                        
-                        # Skip empty values
-                        if value_str:
-                            try:
-                                value = float(value_str)
-                                
-                                plate_data.append({
-                                    'plate_id': plate_id,
-                                    'row_id': row_id,
-                                    'column_id': column_id,
-                                    'value': value,
-                                    'seconds_time_sample': seconds_time_sample
-                                })
-                            except ValueError:
-                                # Skip non-numeric values
-                                print(f"Warning: Skipping non-numeric value at row {row_idx}, col {col_idx}: {value_str}")
-                                continue
-        
-        return plate_data
+                # Pad short rows so every time point has a cell per well
+                if len(row) <= last_col_idx:
+                    row = row + [''] * (last_col_idx + 1 - len(row))
+                cells.extend([row[col_idx] for col_idx in col_idxs])
+                
+                if len(times) >= chunk_rows:
+                    yield self.__chunk_columns(cells, times, header, col_idxs, plate_id, row_ids, column_ids)
+                    times = []
+                    cells = []
+            
+            if not has_rows:
+                raise ValueError(f"CSV file has fewer than 2 rows: {file_path.name}")
+            if times:
+                yield self.__chunk_columns(cells, times, header, col_idxs, plate_id, row_ids, column_ids)
     
-    def ingest_file(self, file_path: Path) -> int:
+    @staticmethod
+    def __chunk_columns(cells: List[str], times: List[int], header: List[str], col_idxs: List[int],
+                        plate_id: int, row_ids: np.ndarray, column_ids: np.ndarray) -> Dict:
+        """Convert one chunk of absorbance cells (time-major, one per well) to column arrays"""
+        seconds_time_sample = np.array(times, dtype=np.int64)
+        
+        # Empty cells are missing values
+        try:
+            value_array = np.fromiter(
+                (float(cell) if cell.strip() else np.nan for cell in cells),
+                dtype=np.float64,
+                count=len(cells)
+            )
+        except ValueError:
+            # Skip non-numeric values
+            value_array = np.full(len(cells), np.nan)
+            for cell_idx, cell in enumerate(cells):
+                if not cell.strip():
+                    continue
+                try:
+                    value_array[cell_idx] = float(cell)
+                except ValueError:
+                    time_idx, well_idx = divmod(cell_idx, len(col_idxs))
+                    print(f"Warning: Skipping non-numeric value at time {times[time_idx]}, "
+                          f"well {header[col_idxs[well_idx]].strip()}: {cell.strip()}")
+        
+        # Cells are already in the file's time-then-well order
+        keep = ~np.isnan(value_array)
+        n_times = len(seconds_time_sample)
+        
+        return {
+            'plate_id': plate_id,
+            'row_id': np.tile(row_ids, n_times)[keep],
+            'column_id': np.tile(column_ids, n_times)[keep],
+            'value': value_array[keep],
+            'seconds_time_sample': np.repeat(seconds_time_sample, len(row_ids))[keep]
+        }
+    
+    def parse_csv_file(self, file_path: Path, plate_id: Optional[int] = None) -> Dict:
         """
-        Ingest a single CSV file into the database.
+        Parse CSV file and extract plate data.
+        
+        Data is returned column-wise: one array per field, with element i of
+        each array making up the i-th record.
         
         Args:
             file_path: Path to CSV file
+            plate_id: Plate ID, if already known; parsed from the filename otherwise
         
         Returns:
-            Number of records inserted
+            Dictionary with plate_id and arrays of row_id, column_id, value, and seconds_time_sample
         """
-        # Parse the CSV file
-        plate_data = self.parse_csv_file(file_path)
+        if plate_id is None:
+            plate_id = self.parse_plate_id_from_filename(file_path.name)
+        chunks = list(self.iter_plate_chunks(file_path, plate_id))
+        
+        def column(key: str, dtype: type) -> np.ndarray:
+            # A file can have a header but no data rows
+            if not chunks:
+                return np.empty(0, dtype=dtype)
+            return np.concatenate([chunk[key] for chunk in chunks])
+        
+        return {
+            'plate_id': plate_id,
+            'row_id': column('row_id', np.int64),
+            'column_id': column('column_id', np.int64),
+            'value': column('value', np.float64),
+            'seconds_time_sample': column('seconds_time_sample', np.int64)
+        }
+    
+    def insert_plate_data(self, session: Session, file_path: Path, plate_id: int, plate_chunks: Iterable[Dict]) -> int:
+        """
+        Insert plate data and its ingest record without committing.
         
-        if not plate_data:
+        Args:
+            session: Open session; the caller owns the transaction
+            file_path: Path of the CSV file the data was parsed from
+            plate_id: Plate ID of the file
+            plate_chunks: Column arrays from parse_csv_file or iter_plate_chunks
+        
+        Returns:
+            Number of records inserted
+        """
+        repo = PlateRepository(session)
+        count = sum(repo.bulk_create_columns(**plate_data, commit=False) for plate_data in plate_chunks)
+        if not count:
             print(f"No data to insert from {file_path.name}")
             return 0
         
-        # Insert into database
+        PlateIngestRepository(session).create(
+            plate_id=plate_id,
+            file_name=file_path.name,
+            num_records=count,
+            commit=False
+        )
+        return count
+    
+    def ingest_file(self, file_path: Path) -> int:
+        """
+        Ingest a single CSV file into the database.
+        
+        Records are streamed from the CSV straight into batched inserts.
+        
+        Args:
+            file_path: Path to CSV file
+        
+        Returns:
+            Number of records inserted
+        """
+        plate_id = self.parse_plate_id_from_filename(file_path.name)
+        if plate_id is None:
+            raise ValueError(f"Could not parse plate_id from filename: {file_path.name}")
+        
         session = self.SessionLocal()
         try:
-            repo = PlateRepository(session)
-            count = repo.bulk_create(plate_data)
-            print(f"Successfully inserted {count} records from {file_path.name}")
+            count = self.insert_plate_data(session, file_path, plate_id, self.iter_plate_chunks(file_path, plate_id))
+            session.commit()
+            if count:
+                print(f"Successfully inserted {count} records from {file_path.name}")
             return count
         except Exception as e:
             session.rollback()
@@ -162,10 +275,38 @@ class AbsorbanceETL:
         finally:
             session.close()
     
+    def __insert_parsed(self, session: Session, file_path: Path, plate_id: int, future: Future) -> int:
+        """
+        Insert a file parsed on the thread pool in its own savepoint.
+        
+        Returns:
+            Number of records inserted, 0 if the file failed to parse or insert
+        """
+        try:
+            plate_data = future.result()
+            with session.begin_nested():
+                count = self.insert_plate_data(session, file_path, plate_id, [plate_data])
+        except Exception as e:
+            print(f"Failed to process {file_path.name}: {e}")
+            return 0
+        
+        if count:
+            print(f"Successfully inserted {count} records from {file_path.name}")
+        return count
+    
     def ingest_directory(self, directory_path: Path, pattern: str = "plate_*_abs.csv") -> int:
         """
         Ingest all matching CSV files from a directory.
         
+        Files are parsed concurrently on a thread pool and inserted in a single
+        transaction as they finish, so the directory costs one commit. At most
+        two files per worker are parsed ahead of the inserts, and each file's
+        arrays are dropped once inserted, so memory doesn't grow with the
+        directory. Each file is wrapped in a savepoint, so a file that fails to
+        insert is skipped without discarding the others. Plate IDs are parsed
+        from the filenames up front, and files whose names carry none are
+        skipped before opening.
+        
         Args:
             directory_path: Path to directory containing CSV files
             pattern: Glob pattern for matching files
@@ -174,20 +315,39 @@ class AbsorbanceETL:
             Total number of records inserted
         """
         total_inserted = 0
-        
+        plate_ids = {}
         for file_path in directory_path.glob(pattern):
-            if file_path.is_file():
-                try:
-                    count = self.ingest_file(file_path)
-                    total_inserted += count
-                except Exception as e:
-                    print(f"Failed to process {file_path.name}: {e}")
-                    continue
+            if not file_path.is_file():
+                continue
+            plate_id = self.parse_plate_id_from_filename(file_path.name)
+            if plate_id is None:
+                print(f"Skipping {file_path.name}: could not parse plate_id from filename")
+                continue
+            plate_ids[file_path] = plate_id
+        
+        session = self.SessionLocal()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # Parses in flight, inserted (and released) in submission order
+                pending = deque()
+                for file_path, plate_id in plate_ids.items():
+                    pending.append((file_path, plate_id, executor.submit(self.parse_csv_file, file_path, plate_id)))
+                    if len(pending) >= 2 * self.max_workers:
+                        total_inserted += self.__insert_parsed(session, *pending.popleft())
+                
+                while pending:
+                    total_inserted += self.__insert_parsed(session, *pending.popleft())
+            
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
         
         print(f"Total records inserted: {total_inserted}")
         return total_inserted
 
-
 def main():
     """Example usage of the ETL script"""
     import sys
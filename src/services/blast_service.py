@@ -1,125 +1,341 @@
 import os
+import io
+import re
+import sys
+import time
+import gzip
+import hashlib
+import tempfile
+import heapq
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import urlencode
+from xml.etree import ElementTree
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-from Bio import Entrez
-from Bio.Blast import NCBIWWW, NCBIXML
+from Bio import SeqIO
 
 from src.repositories.related_organisms_repository import RelatedOrganismsRepository
 
+EUTILS_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+BLAST_URL = "https://blast.ncbi.nlm.nih.gov/Blast.cgi"
+
+# Identifies this project to NCBI, alongside the contact email, as its usage policy asks
+_NCBI_TOOL = "monomer-hackathon-2025"
+
+# NCBI allows at most 3 requests per second from a client without an API key
+_NCBI_MIN_REQUEST_INTERVAL = 1 / 3
+
+# Hits requested per BLAST search; many, so species can be deduplicated
+_BLAST_HITLIST_SIZE = 25
+
+# Request id and search status in the QBlastInfo block of BLAST URL API responses
+_RID_RE = re.compile(r'^\s*RID = (\S+)', re.MULTILINE)
+_STATUS_RE = re.compile(r'^\s*Status=(\w+)', re.MULTILINE)
+
+# Genus and species: the first two whitespace-separated tokens of a hit title
+_SPECIES_RE = re.compile(r'^\s*(\S+)\s+(\S+)')
+# Uncultured or unnamed (sp.) species, which are left out of the related organisms
+_BAD_SPECIES_RE = re.compile(r'Uncultured| sp\.|sp\.$')
+
+
+@lru_cache(maxsize=1024)
+def _eutils_url(endpoint: str, query: tuple[tuple[str, object], ...]) -> str:
+    """Fully encoded E-utilities URL, cached since lookups repeat the same few query shapes"""
+    return f"{EUTILS_URL}/{endpoint}.fcgi?{urlencode(query)}"
+
 
 class BlastAPI:
-    def __init__(self, database_url: str = "sqlite:///./database.db"):
-        self.Entrez = Entrez
-        self.NCBIWWW = NCBIWWW
-        self.NCBIXML = NCBIXML
+    def __init__(self, database_url: str = "sqlite:///./database.db", blast_cache_dir: str = "./blast_cache"):
         self.logger = logging.getLogger(__name__)
         self.entrez_email = os.getenv("ENTREZ_EMAIL")
         
         # Database setup for caching
         self.engine = create_engine(database_url)
         self.SessionLocal = sessionmaker(bind=self.engine)
+        
+        # On-disk cache of raw BLAST XML, keyed by NCBI sequence id
+        self.blast_cache_dir = Path(blast_cache_dir)
+        
+        # Keep-alive session shared by all E-utilities and BLAST calls so they reuse connections
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=10,
+            max_retries=Retry(total=5, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504))
+        ))
+        
+        # Spaces out NCBI requests across all threads using this instance
+        self._rate_lock = threading.Lock()
+        self._next_request_time = 0.0
+
+    def __throttle(self) -> None:
+        """Block until another NCBI request is allowed under the shared request rate limit"""
+        with self._rate_lock:
+            now = time.monotonic()
+            wait = self._next_request_time - now
+            self._next_request_time = max(now, self._next_request_time) + _NCBI_MIN_REQUEST_INTERVAL
+        if wait > 0:
+            time.sleep(wait)
+
+    def __eutils(self, endpoint: str, **params) -> requests.Response:
+        """
+        Call an NCBI E-utilities endpoint over the pooled session.
+        
+        Args:
+            endpoint: E-utility name, e.g. "esearch" or "efetch"
+            **params: Query parameters for the call
+        """
+        params.setdefault("tool", _NCBI_TOOL)
+        if self.entrez_email:
+            params.setdefault("email", self.entrez_email)
+        self.__throttle()
+        response = self._session.get(_eutils_url(endpoint, tuple(params.items())), timeout=30)
+        response.raise_for_status()
+        return response
 
-    def __get_16S_sequence(self, organism_name: str) -> tuple[str, str]:
+    def __get_16S_sequence(self, organism_name: str) -> tuple[str, str, str]:
         """
         Get 16S rRNA sequence and canonical organism name from NCBI.
         
         Returns:
-            tuple: (fasta_sequence, canonical_organism_name)
+            tuple: (fasta_sequence, canonical_organism_name, seq_id)
+        """
+        search = self.__eutils("esearch", db="nucleotide", term=f"{organism_name}[Organism] AND 16S ribosomal RNA[Title]", retmax=1, retmode="json")
+        seq_id = search.json()["esearchresult"]["idlist"][0]
+        
+        # A single GenBank fetch carries both the sequence and the canonical organism name
+        gb_record = self.__eutils("efetch", db="nucleotide", id=seq_id, rettype="gb", retmode="text").text
+        record = SeqIO.read(io.StringIO(gb_record), "genbank")
+        fasta = f">{record.id}\n{record.seq}\n"
+        canonical_name = record.annotations.get("organism", organism_name)
+        
+        self.logger.info(f"Canonical organism name from NCBI: {canonical_name}")
+        return fasta, canonical_name, seq_id
+
+    def __blast_cache_path(self, seq_id: str, exclude_organism: str) -> Path:
         """
-        search = self.Entrez.esearch(db="nucleotide", term=f"{organism_name}[Organism] AND 16S ribosomal RNA[Title]", retmax=1)
-        record = self.Entrez.read(search)
-        seq_id = record["IdList"][0]
+        Path of the cached BLAST XML for an NCBI sequence id.
         
-        # Fetch the FASTA sequence
-        fasta = self.Entrez.efetch(db="nucleotide", id=seq_id, rettype="fasta", retmode="text").read()
+        The query parameters are part of the key, so results of a search with a
+        different exclusion or hitlist size are never read back.
+        """
+        key = f"{seq_id}|{exclude_organism}|{_BLAST_HITLIST_SIZE}"
+        return self.blast_cache_dir / f"{hashlib.sha1(key.encode()).hexdigest()}.xml.gz"
+
+    def __submit_blast(self, sequence: str, exclude_organism: str) -> str:
+        """
+        Submit a blastn search against nt (CMD=Put) and return its request id.
         
-        # Fetch the GenBank record to get the canonical organism name
-        gb_record = self.Entrez.efetch(db="nucleotide", id=seq_id, rettype="gb", retmode="text").read()
+        Args:
+            sequence: The 16S rRNA sequence to BLAST
+            exclude_organism: Canonical organism name to exclude from results
+        """
+        self.__throttle()
+        response = self._session.post(BLAST_URL, data={
+            "CMD": "Put",
+            "PROGRAM": "blastn",
+            "DATABASE": "nt",
+            "QUERY": sequence,
+            "ENTREZ_QUERY": f"NOT {exclude_organism}[Organism]",
+            "HITLIST_SIZE": _BLAST_HITLIST_SIZE,
+            "TOOL": _NCBI_TOOL,
+            "EMAIL": self.entrez_email or ""
+        }, timeout=60)
+        response.raise_for_status()
         
-        # Extract the organism name from the GenBank record
-        # Look for the ORGANISM line which contains the canonical name
-        canonical_name = organism_name  # default fallback
-        for line in gb_record.split('\n'):
-            if line.strip().startswith('ORGANISM'):
-                # Format: "  ORGANISM  Escherichia coli"
-                canonical_name = line.split('ORGANISM')[1].strip()
-                break
+        match = _RID_RE.search(response.text)
+        if not match:
+            raise ValueError("BLAST submission did not return a request id")
+        return match.group(1)
+
+    def __wait_for_blast(self, rid: str, max_polls: int = 20) -> None:
+        """
+        Poll a submitted BLAST search until it is ready.
         
-        self.logger.info(f"Canonical organism name from NCBI: {canonical_name}")
-        return fasta, canonical_name
+        The delay between polls doubles from 5s up to 60s, so short searches
+        come back quickly without polling long ones more than once a minute.
+        Transient 5xx responses are retried by the session's HTTPAdapter.
+        
+        Args:
+            rid: BLAST request id returned by __submit_blast
+            max_polls: Number of status checks before giving up
+        """
+        for attempt in range(max_polls):
+            time.sleep(min(5 * 2 ** attempt, 60))
+            self.__throttle()
+            response = self._session.get(BLAST_URL, params={
+                "CMD": "Get",
+                "FORMAT_OBJECT": "SearchInfo",
+                "RID": rid
+            }, timeout=60)
+            response.raise_for_status()
+            
+            match = _STATUS_RE.search(response.text)
+            status = match.group(1) if match else "UNKNOWN"
+            if status == "READY":
+                return
+            if status != "WAITING":
+                raise ValueError(f"BLAST search {rid} ended with status {status}")
+        
+        raise TimeoutError(f"BLAST search {rid} was not ready after {max_polls} polls")
+
+    @staticmethod
+    def __check_xml(xml_text: str, chunk_size: int = 1 << 16) -> None:
+        """
+        Check that a document is well-formed XML without building its tree.
+        
+        The text is fed to a pull parser a chunk at a time, and each element is
+        cleared as soon as it is complete.
+        
+        Raises:
+            ElementTree.ParseError: If the document is malformed or truncated
+        """
+        parser = ElementTree.XMLPullParser(events=('end',))
+        for start in range(0, len(xml_text), chunk_size):
+            parser.feed(xml_text[start:start + chunk_size])
+            for _, elem in parser.read_events():
+                elem.clear()
+        parser.close()
 
-    def __run_blast(self, sequence: str, exclude_organism: str) -> str:
+    def __run_blast(self, sequence: str, exclude_organism: str, seq_id: str) -> io.StringIO:
         """
         Run BLAST query excluding the target organism.
         
+        The raw XML response is cached on disk by seq_id and query parameters
+        so re-parsing the same sequence (e.g. after a filter change) skips the
+        BLAST search. Responses that aren't well-formed XML are never cached.
+        
         Args:
             sequence: The 16S rRNA sequence to BLAST
             exclude_organism: Canonical organism name to exclude from results
+            seq_id: NCBI id of the sequence, used in the cache key
+        
+        Returns:
+            In-memory handle on the BLAST XML
         """
-        result_handle = self.NCBIWWW.qblast(
-            program="blastn",
-            database="nt",
-            sequence=sequence,
-            entrez_query=f"NOT {exclude_organism}[Organism]",
-            hitlist_size=25  # get many results so we can deduplicate
-        )
-        return result_handle
+        cache_path = self.__blast_cache_path(seq_id, exclude_organism)
+        if cache_path.exists():
+            self.logger.info(f"BLAST cache hit for sequence: {seq_id}")
+            with gzip.open(cache_path, 'rt') as cache_file:
+                return io.StringIO(cache_file.read())
+        
+        rid = self.__submit_blast(sequence, exclude_organism)
+        self.logger.info(f"Submitted BLAST search: {rid}")
+        self.__wait_for_blast(rid)
+        
+        self.__throttle()
+        response = self._session.get(BLAST_URL, params={
+            "CMD": "Get",
+            "FORMAT_TYPE": "XML",
+            "RID": rid
+        }, timeout=60)
+        response.raise_for_status()
+        blast_xml = response.text
+        
+        try:
+            self.__check_xml(blast_xml)
+        except ElementTree.ParseError as e:
+            raise ValueError(f"BLAST search {rid} returned malformed XML: {e}") from e
+        
+        # Write to a temporary file and swap it in, so an interrupted write or a
+        # concurrent lookup of the same key never leaves a truncated cache file
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            with gzip.open(tmp_path, 'wt') as cache_file:
+                cache_file.write(blast_xml)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        
+        return io.StringIO(blast_xml)
 
-    def __parse_blast_results(self, result_handle: str) -> str:
-        blast_record = next(self.NCBIXML.parse(result_handle))
-        return blast_record
+    def __parse_blast_results(self, result_handle) -> Iterator[tuple[str, int, int, float]]:
+        """
+        Stream hits out of the BLAST XML one at a time.
+        
+        Only the first HSP of each hit is read, and each Hit element is
+        cleared once yielded so the full record tree is never held in memory.
+        
+        Yields:
+            tuple: (hit_def, identities, align_length, score)
+        """
+        for _, elem in ElementTree.iterparse(result_handle, events=('end',)):
+            if elem.tag == 'Hit':
+                hsp = elem.find('Hit_hsps/Hsp')
+                if hsp is not None:
+                    yield (
+                        elem.findtext('Hit_def', ''),
+                        int(hsp.findtext('Hsp_identity')),
+                        int(hsp.findtext('Hsp_align-len')),
+                        float(hsp.findtext('Hsp_score'))
+                    )
+                elem.clear()
+            elif elem.tag == 'Iteration':
+                # Only the first query is BLASTed
+                return
 
-    def __filter_blast_results(self, blast_record: str, exclude_organism: str) -> str:
+    def __filter_blast_results(self, hits: Iterator[tuple[str, int, int, float]], exclude_organism: str, max_species: int = 50) -> dict:
         """
         Filter BLAST results to get unique species, excluding the target organism.
         
         Args:
-            blast_record: Parsed BLAST results
+            hits: Streamed BLAST hits from __parse_blast_results
             exclude_organism: Canonical organism name to exclude (case-insensitive)
+            max_species: Stop reading hits once this many unique species are collected
         """
         unique_species = {}
+        seen = set()
         exclude_organism_lower = exclude_organism.lower()
         
-        for alignment in blast_record.alignments:
-            title = alignment.hit_def
-            hsp = alignment.hsps[0]
-            identity = (hsp.identities / hsp.align_length) * 100
-            score = hsp.score
-            parts = title.split()
-            if len(parts) >= 2:
-                species_name = " ".join(parts[:2])
-            else:
+        for title, identities, align_length, score in hits:
+            match = _SPECIES_RE.match(title)
+            if not match:
                 continue
+            species_name = sys.intern(f"{match[1]} {match[2]}")
             
-            # Skip if this is the target organism (case-insensitive) or already in results
-            if species_name.lower() == exclude_organism_lower or species_name in unique_species:
+            # Skip species already seen, so the case-insensitive target check runs once per species
+            if species_name in seen:
+                continue
+            seen.add(species_name)
+            if species_name.lower() == exclude_organism_lower:
                 continue
             
             unique_species[species_name] = {
                 "title": title,
                 "score": score,
-                "identity": identity,
-                "align_length": hsp.align_length
+                "identity": (identities / align_length) * 100,
+                "align_length": align_length
             }
+            if len(unique_species) >= max_species:
+                break
         return unique_species
     
-    def __sort_blast_results(self, unique_species: dict) -> list:
-        sorted_species = sorted(unique_species.items(), key=lambda x: x[1]["identity"], reverse=True)
-        return [species for species, data in sorted_species]
-
-    def __filter_species(self, unique_species: list) -> list:
-        filtered_species = []
-        for species in unique_species:
-            if 'Uncultured' in species:
-                continue
-            if species.endswith('sp.'):
-                continue
-            if ' sp.' in species:
-                continue
-            filtered_species.append(species)
-        return filtered_species
+    def __top_k_filtered(self, unique_species: dict, k: int = 10) -> list:
+        """
+        Rank species by identity and keep the top k, skipping uncultured and unnamed (sp.) entries.
+        
+        Args:
+            unique_species: Species name to hit data, as returned by __filter_blast_results
+            k: Number of species to return
+        """
+        named_species = (
+            (data["identity"], species)
+            for species, data in unique_species.items()
+            if not _BAD_SPECIES_RE.search(species)
+        )
+        return [species for _, species in heapq.nlargest(k, named_species, key=lambda x: x[0])]
 
     def get_top_10_related_organisms(self, organism_name: str) -> list:
         """
@@ -147,27 +363,63 @@ class BlastAPI:
             
             # Cache miss - run the actual BLAST query
             # Get the 16S sequence AND the canonical organism name from NCBI
-            sequence, canonical_name = self.__get_16S_sequence(organism_name)
+            sequence, canonical_name, seq_id = self.__get_16S_sequence(organism_name)
             
             # Run BLAST excluding the canonical organism name
-            result_handle = self.__run_blast(sequence, canonical_name)
-            blast_record = self.__parse_blast_results(result_handle)
+            result_handle = self.__run_blast(sequence, canonical_name, seq_id)
+            hits = self.__parse_blast_results(result_handle)
             
             # Filter results, excluding the canonical organism name
-            unique_species = self.__filter_blast_results(blast_record, canonical_name)
-            sorted_species = self.__sort_blast_results(unique_species)
-            filtered_species = self.__filter_species(sorted_species)
-            
-            result = [species for species in filtered_species][:10] if len(filtered_species) > 10 else filtered_species
+            unique_species = self.__filter_blast_results(hits, canonical_name)
+            result = self.__top_k_filtered(unique_species, k=10)
             
             # Cache the result
             if result:
                 # Store as comma-separated string
                 related_organisms_str = ','.join(result)
-                repository.create(organism_name.lower().strip(), related_organisms_str)
+                repository.upsert(organism_name.lower().strip(), related_organisms_str)
                 self.logger.info(f"Cached related organisms for: {organism_name}")
             
             return result
             
         finally:
-            session.close()
\ No newline at end of file
+            session.close()
+
+    def get_top_10_related_organisms_batch(self, organism_names: list[str], max_workers: int = 3) -> dict[str, list]:
+        """
+        Get top 10 related organisms for several organisms concurrently.
+        
+        Lookups run on a thread pool so the NCBI round-trips and BLAST waits of
+        different organisms overlap; all threads share this instance's NCBI
+        request rate limit. Organisms that differ only in case or surrounding
+        whitespace are looked up once. An organism whose lookup fails is
+        logged and left out, without discarding the others.
+        
+        Args:
+            organism_names: Names of the target organisms
+            max_workers: Number of concurrent lookups
+            
+        Returns:
+            Dict mapping each successfully looked up organism name to its list of related organism names
+        """
+        lookup_names = {}
+        for organism_name in organism_names:
+            lookup_names.setdefault(organism_name.lower().strip(), organism_name)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                key: executor.submit(self.get_top_10_related_organisms, organism_name)
+                for key, organism_name in lookup_names.items()
+            }
+            results = {}
+            for key, future in futures.items():
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    self.logger.error(f"Failed to get related organisms for {lookup_names[key]}: {e}")
+        
+        return {
+            organism_name: results[organism_name.lower().strip()]
+            for organism_name in organism_names
+            if organism_name.lower().strip() in results
+        }
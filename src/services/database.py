@@ -0,0 +1,61 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+
+def create_etl_engine(database_url: str) -> Engine:
+    """
+    Create an engine that can be shared by ETL worker threads.
+    
+    For SQLite the connection may be used outside the thread that opened it,
+    and WAL journaling lets readers proceed while a worker is writing. With
+    WAL, synchronous=NORMAL only fsyncs at checkpoints rather than every commit.
+    
+    pysqlite doesn't emit BEGIN before a SAVEPOINT, which makes SQLite treat
+    the savepoint as the outermost transaction and commit it on RELEASE. The
+    driver's own transaction handling is turned off and BEGIN is emitted
+    explicitly instead, so begin_nested() savepoints stay inside the
+    session's transaction.
+    """
+    if not database_url.startswith("sqlite"):
+        return create_engine(database_url)
+    
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragma(dbapi_connection, connection_record):
+        # Stop pysqlite from issuing BEGIN/COMMIT itself, see _begin_transaction
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+    
+    @event.listens_for(engine, "begin")
+    def _begin_transaction(conn):
+        conn.exec_driver_sql("BEGIN")
+    
+    return engine
+
+
+def create_read_engine(database_url: str) -> Engine:
+    """
+    Create an engine for services that repeatedly read the same data.
+    
+    Pooled connections are checked before use and recycled hourly. For SQLite,
+    WAL journaling lets reads proceed during ETL writes, and a larger page
+    cache keeps recently read plates in memory on each pooled connection.
+    """
+    if not database_url.startswith("sqlite"):
+        return create_engine(database_url, pool_pre_ping=True, pool_size=8, pool_recycle=3600)
+    
+    engine = create_engine(database_url, pool_size=8)
+    
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        # Negative cache_size is in KiB: 64 MiB per connection
+        cursor.execute("PRAGMA cache_size=-65536")
+        cursor.close()
+    
+    return engine
@@ -1,14 +1,18 @@
 import csv
+import os
 import re
 from pathlib import Path
 from typing import Dict, Optional, List
-from sqlalchemy import create_engine
+from concurrent.futures import ThreadPoolExecutor
 from sqlalchemy.orm import Session, sessionmaker
 
+from src.services.database import create_etl_engine
 from src.repositories.experiment_repository import ExperimentRepository
 from src.repositories.reagent_value_repository import ReagentValueRepository
 from src.repositories.reagent_repository import ReagentRepository
 
+_EXP_ID_RE = re.compile(r'exp\s+(\d+)', re.IGNORECASE)
+
 
 class ExperimentETL:
     """ETL script to ingest experiment data from CSV files"""
@@ -17,10 +21,17 @@ class ExperimentETL:
     CELL_CONCENTRATION_KEY = "cell concentration"
     DILUTION_KEY = "dilution"
     
-    def __init__(self, database_url: str = "sqlite:///./database.db"):
-        """Initialize ETL with database connection"""
-        self.engine = create_engine(database_url)
+    def __init__(self, database_url: str = "sqlite:///./database.db", max_workers: Optional[int] = None):
+        """
+        Initialize ETL with database connection
+        
+        Args:
+            database_url: Database URL
+            max_workers: Number of threads used by ingest_directory (default: CPU count)
+        """
+        self.engine = create_etl_engine(database_url)
         self.SessionLocal = sessionmaker(bind=self.engine)
+        self.max_workers = max_workers or os.cpu_count()
     
     @staticmethod
     def parse_experiment_id_from_filename(filename: str) -> Optional[int]:
@@ -29,7 +40,7 @@ class ExperimentETL:
         
         Example: "Costs analysis of chemicals - exp 1.csv" -> 1
         """
-        match = re.search(r'exp\s+(\d+)', filename, re.IGNORECASE)
+        match = _EXP_ID_RE.search(filename)
         if match:
             return int(match.group(1))
         return None
@@ -144,14 +155,18 @@ class ExperimentETL:
             reagent_values_to_insert = []
             skipped_reagents = []
             
+            # Look up all reagent IDs by name in a single query
+            reagent_ids = reagent_repo.get_ids_by_names(
+                [rv_data['reagent_name'] for rv_data in experiment_data['reagent_values']]
+            )
+            
             for rv_data in experiment_data['reagent_values']:
-                # Look up reagent by name
-                reagent = reagent_repo.get_by_name(rv_data['reagent_name'])
+                reagent_id = reagent_ids.get(rv_data['reagent_name'])
                 
-                if reagent:
+                if reagent_id is not None:
                     reagent_values_to_insert.append({
                         'experiment_id': experiment.id,
-                        'reagent_id': reagent.id,
+                        'reagent_id': reagent_id,
                         'value': rv_data['value'],
                         'unit': rv_data['unit']
                     })
@@ -182,6 +197,8 @@ class ExperimentETL:
         """
         Ingest all matching CSV files from a directory.
         
+        Files are ingested concurrently on a thread pool, each with its own session.
+        
         Args:
             directory_path: Path to directory containing CSV files
             pattern: Glob pattern for matching files
@@ -190,11 +207,14 @@ class ExperimentETL:
             List of experiment IDs created
         """
         experiment_ids = []
+        file_paths = [file_path for file_path in directory_path.glob(pattern) if file_path.is_file()]
         
-        for file_path in directory_path.glob(pattern):
-            if file_path.is_file():
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {file_path: executor.submit(self.ingest_file, file_path) for file_path in file_paths}
+            
+            for file_path, future in futures.items():
                 try:
-                    experiment_id = self.ingest_file(file_path)
+                    experiment_id = future.result()
                     experiment_ids.append(experiment_id)
                 except Exception as e:
                     print(f"Failed to process {file_path.name}: {e}")
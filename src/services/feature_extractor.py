@@ -1,11 +1,34 @@
+import copy
+import numpy as np
 import pandas as pd
-from typing import Optional
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from collections import OrderedDict
+from itertools import groupby
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+from sqlalchemy.orm import Session, sessionmaker
 
+from src.models.experiment import Experiment
 from src.repositories.experiment_repository import ExperimentRepository
-from src.repositories.reagent_value_repository import ReagentValueRepository
 from src.repositories.plate_repository import PlateRepository
+from src.repositories.plate_ingest_repository import PlateIngestRepository
+from src.services.database import create_read_engine
+
+# Columns of the features dataframe, in order
+FEATURE_COLS = tuple(f'feature_{i}' for i in range(1, 17))
+METADATA_COLS = ('plate_id', 'row_id', 'column_id', 'seconds_time_sample', 'absorbance')
+
+# pandas treats a tuple as a single column label, so selections use a list
+_FEATURE_COLS_LIST = list(FEATURE_COLS)
+
+# Column dtypes of the default (compact) features dataframe
+_COMPACT_DTYPES = {
+    **{col: np.float32 for col in FEATURE_COLS},
+    'plate_id': np.int32,
+    'row_id': np.int16,
+    'column_id': np.int16,
+    'seconds_time_sample': np.int32,
+    'absorbance': np.float32
+}
 
 
 class FeatureExtractor:
@@ -16,12 +39,92 @@ class FeatureExtractor:
     to create a feature matrix for analysis.
     """
     
-    def __init__(self, database_url: str = "sqlite:///./database.db"):
-        """Initialize feature extractor with database connection"""
-        self.engine = create_engine(database_url)
+    def __init__(self, database_url: str = "sqlite:///./database.db", cache_size: int = 128):
+        """
+        Initialize feature extractor with database connection
+        
+        Args:
+            database_url: Database URL
+            cache_size: Number of (experiment_id, plate_id) results kept in memory
+        """
+        self.engine = create_read_engine(database_url)
         self.SessionLocal = sessionmaker(bind=self.engine)
+        self.cache_size = cache_size
+        self._features_cache: OrderedDict = OrderedDict()
+        self._summary_cache: OrderedDict = OrderedDict()
+    
+    @contextmanager
+    def session_scope(self) -> Iterator[Session]:
+        """
+        Open a session that can be passed to several extractor calls.
+        
+        Example:
+            with extractor.session_scope() as session:
+                for plate_id in plate_ids:
+                    extractor.get_features_dataframe(experiment_id, plate_id, session=session)
+        """
+        session = self.SessionLocal()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    def _session(self, session: Optional[Session]):
+        """Use the caller's session as-is, or open a new one for the duration of a call"""
+        if session is not None:
+            return nullcontext(session)
+        return self.session_scope()
+    
+    def _data_version(self, session: Session, experiment_id: int, plate_id: int) -> tuple:
+        """Cache key for the data behind one features dataframe, see _data_versions"""
+        return self._data_versions(session, [(experiment_id, plate_id)])[(experiment_id, plate_id)]
+    
+    @staticmethod
+    def _data_versions(session: Session, pairs: List[tuple]) -> Dict[tuple, tuple]:
+        """
+        Cache keys for the data behind several features dataframes.
+        
+        A key holds the experiment's parameters and reagent values themselves,
+        which are all the features depend on, plus the plate's record count,
+        min and max record IDs and latest plate_ingest ID. Deleting,
+        re-ingesting or recreating either side changes the key, even when
+        SQLite reuses the IDs of deleted rows.
+        
+        Returns:
+            Dictionary mapping (experiment_id, plate_id) to its cache key
+        """
+        experiment_parameters = ExperimentRepository(session).get_parameters_by_ids(e for e, _ in pairs)
+        plate_stats = PlateRepository(session).get_row_stats_by_plate_ids(p for _, p in pairs)
+        ingest_versions = PlateIngestRepository(session).get_latest_ids(p for _, p in pairs)
+        return {
+            (e, p): (
+                e,
+                p,
+                experiment_parameters.get(e),
+                plate_stats.get(p, (0, None, None)),
+                ingest_versions.get(p)
+            )
+            for e, p in pairs
+        }
+    
+    def _cache_put(self, cache: OrderedDict, key: tuple, value) -> None:
+        """Store a value in an LRU cache, evicting the least recently used entry when full"""
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
     
-    def get_features_dataframe(self, experiment_id: int, plate_id: int) -> pd.DataFrame:
+    def get_features_dataframe(
+        self,
+        experiment_id: int,
+        plate_id: int,
+        high_precision: bool = False,
+        session: Optional[Session] = None
+    ) -> pd.DataFrame:
         """
         Generate a features dataframe combining experiment and plate data.
         
@@ -30,101 +133,274 @@ class FeatureExtractor:
         - feature_16: cell_concentration / (dilution * row_index)
         - Additional columns: plate_id, well info, time, absorbance value
         
+        Results are cached in memory, keyed on the experiment's parameters and
+        the plate's record count and ID range (see _data_versions), so repeat
+        calls cost three small queries. Each call returns its own copy.
+        
+        Columns are downcast to float32 and int16/int32 by default, halving
+        the dataframe's memory.
+        
         Args:
             experiment_id: ID of the experiment
             plate_id: ID of the plate
+            high_precision: Return float64/int64 columns instead
+            session: Session to query with, e.g. from session_scope; a new one is opened otherwise
         
         Returns:
             pandas DataFrame with features for each plate measurement
         """
-        session = self.SessionLocal()
+        with self._session(session) as session:
+            key = self._data_version(session, experiment_id, plate_id)
+            df = self._cached_features(session, key)
         
-        try:
-            # Initialize repositories
-            experiment_repo = ExperimentRepository(session)
-            reagent_value_repo = ReagentValueRepository(session)
-            plate_repo = PlateRepository(session)
-            
-            # Get experiment data
-            experiment = experiment_repo.get_by_id(experiment_id)
-            if not experiment:
-                raise ValueError(f"Experiment {experiment_id} not found")
-            
-            # Get reagent values for the experiment
-            reagent_values = reagent_value_repo.get_by_experiment_id(experiment_id)
-            
-            # Sort reagent values by reagent_id to ensure consistent ordering
-            reagent_values_sorted = sorted(reagent_values, key=lambda rv: rv.reagent_id)
-            
-            # Get plate data
-            plate_data = plate_repo.get_by_plate_id(plate_id)
-            if not plate_data:
-                raise ValueError(f"No data found for plate {plate_id}")
-            
-            # Create base dataframe from plate data
-            plate_records = []
-            for record in plate_data:
-                plate_records.append({
-                    'plate_id': record.plate_id,
-                    'row_id': record.row_id,
-                    'column_id': record.column_id,
-                    'absorbance': record.value,
-                    'seconds_time_sample': record.seconds_time_sample,
-                    'created_at': record.created_at
-                })
-            
-            df = pd.DataFrame(plate_records)
-            
-            # Add reagent features (feature_1 through feature_15)
-            for idx, reagent_value in enumerate(reagent_values_sorted, start=1):
-                if idx <= 15:  # Limit to 15 reagent features
-                    df[f'feature_{idx}'] = reagent_value.value
-            
-            # Fill any missing features (if less than 15 reagents) with 0
-            for idx in range(1, 16):
-                if f'feature_{idx}' not in df.columns:
-                    df[f'feature_{idx}'] = 0.0
-            
-            # Calculate feature_16: cell_concentration / (dilution * row_index)
-            # Row index is 1-based (each row in the dataframe)
-            df['row_index'] = range(1, len(df) + 1)
-            df['feature_16'] = experiment.cell_concentration / (experiment.dilution * df['row_index'])
-            
-            # Reorder columns to have features first
-            feature_cols = [f'feature_{i}' for i in range(1, 17)]
-            other_cols = ['plate_id', 'row_id', 'column_id', 'seconds_time_sample', 'absorbance', 'created_at']
-            
-            # Only include columns that exist
-            final_cols = feature_cols + [col for col in other_cols if col in df.columns]
-            df = df[final_cols]
+        if high_precision:
+            return df.copy()
+        return df.astype(_COMPACT_DTYPES)
+    
+    def get_features_arrays(
+        self,
+        experiment_id: int,
+        plate_id: int,
+        high_precision: bool = False,
+        session: Optional[Session] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Get the features as one numpy array per column, for ML pipelines
+        that don't need a DataFrame.
+        
+        Columns and dtypes are the same as get_features_dataframe; each call
+        returns its own arrays.
+        
+        Args:
+            experiment_id: ID of the experiment
+            plate_id: ID of the plate
+            high_precision: Return float64/int64 arrays instead
+            session: Session to query with, e.g. from session_scope; a new one is opened otherwise
+        
+        Returns:
+            Dictionary mapping column name to array, in dataframe column order
+        """
+        with self._session(session) as session:
+            key = self._data_version(session, experiment_id, plate_id)
+            df = self._cached_features(session, key)
+        
+        return {
+            col: df[col].to_numpy(dtype=None if high_precision else _COMPACT_DTYPES[col], copy=True)
+            for col in df.columns
+        }
+    
+    def _cached_features(self, session: Session, key: tuple) -> pd.DataFrame:
+        """Get the features dataframe for a _data_version key, building it on a cache miss"""
+        df = self._features_cache.get(key)
+        if df is None:
+            experiment_id, plate_id = key[:2]
+            df = self._build_features_dataframe(session, experiment_id, plate_id)
+            self._cache_put(self._features_cache, key, df)
+        else:
+            self._features_cache.move_to_end(key)
+        return df
+    
+    def get_features_batch(
+        self,
+        experiment_ids: Iterable[int],
+        plate_ids: Iterable[int],
+        high_precision: bool = False,
+        session: Optional[Session] = None
+    ) -> Dict[tuple, pd.DataFrame]:
+        """
+        Generate features dataframes for several (experiment, plate) pairs.
+        
+        Equivalent to calling get_features_dataframe for each pair, but cache
+        versions, experiments and plate data are each fetched with a single
+        query across all pairs, so the number of queries doesn't grow with
+        the number of plates.
+        
+        Args:
+            experiment_ids: Experiment IDs, paired element-wise with plate_ids
+            plate_ids: Plate IDs, paired element-wise with experiment_ids; must be the same length
+            high_precision: Return float64/int64 columns instead
+            session: Session to query with, e.g. from session_scope; a new one is opened otherwise
+        
+        Returns:
+            Dictionary mapping (experiment_id, plate_id) to its features dataframe
+        """
+        pairs = list(dict.fromkeys(zip(experiment_ids, plate_ids, strict=True)))
+        
+        with self._session(session) as session:
+            keys = self._data_versions(session, pairs)
             
-            return df
+            frames = {}
+            for pair, key in keys.items():
+                df = self._features_cache.get(key)
+                if df is not None:
+                    self._features_cache.move_to_end(key)
+                    frames[pair] = df
             
-        finally:
-            session.close()
+            missing = [pair for pair in pairs if pair not in frames]
+            if missing:
+                experiments = {
+                    experiment.id: experiment
+                    for experiment in ExperimentRepository(session).get_with_reagent_values_by_ids(
+                        e for e, _ in missing
+                    )
+                }
+                # Rows come back grouped by plate, in insertion order within each plate
+                plate_rows = {
+                    plate_id: list(rows)
+                    for plate_id, rows in groupby(
+                        PlateRepository(session).get_columns_by_plate_ids(p for _, p in missing),
+                        key=lambda row: row[0]
+                    )
+                }
+                
+                for experiment_id, plate_id in missing:
+                    if experiment_id not in experiments:
+                        raise ValueError(f"Experiment {experiment_id} not found")
+                    if plate_id not in plate_rows:
+                        raise ValueError(f"No data found for plate {plate_id}")
+                    df = self._assemble_features_dataframe(experiments[experiment_id], plate_rows[plate_id])
+                    self._cache_put(self._features_cache, keys[(experiment_id, plate_id)], df)
+                    frames[(experiment_id, plate_id)] = df
+        
+        if high_precision:
+            return {pair: frames[pair].copy() for pair in pairs}
+        return {pair: frames[pair].astype(_COMPACT_DTYPES) for pair in pairs}
+    
+    @staticmethod
+    def _get_experiment(session: Session, experiment_id: int) -> Experiment:
+        """Get an experiment and its reagent values in one round-trip"""
+        # Reagent values come back ordered by reagent_id to ensure consistent ordering
+        experiment = ExperimentRepository(session).get_with_reagent_values(experiment_id)
+        if not experiment:
+            raise ValueError(f"Experiment {experiment_id} not found")
+        return experiment
+    
+    @staticmethod
+    def _feature_block(experiment: Experiment, num_rows: int) -> np.ndarray:
+        """
+        Compute feature_1 through feature_16 for a plate with num_rows records.
+        
+        Features only depend on the experiment and the row count, not on the
+        plate measurements themselves.
+        
+        Returns:
+            float64 array of shape (16, num_rows), one row per feature
+        """
+        # Reagent features (feature_1 through feature_15)
+        # Missing features (if less than 15 reagents) stay 0
+        reagent_features = np.zeros(15, dtype=np.float64)
+        for idx, reagent_value in enumerate(experiment.reagent_values[:15]):
+            reagent_features[idx] = reagent_value.value
+        
+        # All 16 features are filled into one preallocated buffer
+        features = np.empty((16, num_rows), dtype=np.float64)
+        features[:15] = reagent_features[:, np.newaxis]
+        
+        # feature_16: cell_concentration / (dilution * row_index)
+        # Row index is 1-based (each row in the dataframe)
+        row_index = np.arange(1, num_rows + 1, dtype=np.float64)
+        np.divide(experiment.cell_concentration, experiment.dilution * row_index, out=features[15])
+        return features
+    
+    def _build_features_dataframe(self, session: Session, experiment_id: int, plate_id: int) -> pd.DataFrame:
+        """Query experiment and plate data and build the features dataframe, see get_features_dataframe"""
+        experiment = self._get_experiment(session, experiment_id)
+        
+        # Get plate data as row tuples, skipping ORM object construction
+        plate_rows = PlateRepository(session).get_columns_by_plate_id(plate_id)
+        if not plate_rows:
+            raise ValueError(f"No data found for plate {plate_id}")
+        
+        return self._assemble_features_dataframe(experiment, plate_rows)
     
-    def get_features_summary(self, experiment_id: int, plate_id: int) -> dict:
+    def _assemble_features_dataframe(self, experiment: Experiment, plate_rows: List[tuple]) -> pd.DataFrame:
+        """Build the features dataframe from an experiment and one plate's row tuples"""
+        features = self._feature_block(experiment, len(plate_rows))
+        
+        # Build the dataframe in one go, with columns already in their final
+        # order: features first, then plate data. The arrays are freshly built,
+        # so the dataframe can take them without copying
+        plate_ids, row_ids, column_ids, values, seconds_time_samples = zip(*plate_rows)
+        df = pd.DataFrame({
+            **dict(zip(FEATURE_COLS, features)),
+            'plate_id': np.array(plate_ids, dtype=np.int64),
+            'row_id': np.array(row_ids, dtype=np.int64),
+            'column_id': np.array(column_ids, dtype=np.int64),
+            'seconds_time_sample': np.array(seconds_time_samples, dtype=np.int64),
+            'absorbance': np.array(values, dtype=np.float64)
+        }, copy=False)
+        
+        return df
+    
+    @staticmethod
+    def _describe(values: np.ndarray, columns: Sequence[str]) -> dict:
+        """
+        Same statistics as DataFrame.describe().to_dict(), computed with
+        numpy reductions over values, an array with one row per column.
+        """
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        count = np.count_nonzero(~np.isnan(values), axis=1).astype(np.float64)
+        quartiles = np.nanquantile(values, [0.25, 0.5, 0.75], axis=1)
+        stats = {
+            'count': count,
+            'mean': np.nanmean(values, axis=1),
+            'std': np.nanstd(values, axis=1, ddof=1),
+            'min': np.nanmin(values, axis=1),
+            '25%': quartiles[0],
+            '50%': quartiles[1],
+            '75%': quartiles[2],
+            'max': np.nanmax(values, axis=1)
+        }
+        stats = {name: stat.tolist() for name, stat in stats.items()}
+        return {
+            col: {name: stat[idx] for name, stat in stats.items()}
+            for idx, col in enumerate(columns)
+        }
+    
+    def get_features_summary(self, experiment_id: int, plate_id: int, session: Optional[Session] = None) -> dict:
         """
         Get a summary of the features extracted.
         
+        Summaries are cached under the same key as the features dataframe.
+        When that dataframe isn't cached, the summary is computed without
+        reading plate measurements: features only need the plate's row count.
+        
         Args:
             experiment_id: ID of the experiment
             plate_id: ID of the plate
+            session: Session to query with, e.g. from session_scope; a new one is opened otherwise
         
         Returns:
             Dictionary with summary statistics
         """
-        df = self.get_features_dataframe(experiment_id, plate_id)
-        
-        return {
-            'num_records': len(df),
-            'num_features': 16,
-            'plate_id': plate_id,
-            'experiment_id': experiment_id,
-            'feature_columns': [col for col in df.columns if col.startswith('feature_')],
-            'shape': df.shape,
-            'feature_stats': df[[f'feature_{i}' for i in range(1, 17)]].describe().to_dict()
-        }
+        with self._session(session) as session:
+            key = self._data_version(session, experiment_id, plate_id)
+            summary = self._summary_cache.get(key)
+            if summary is None:
+                df = self._features_cache.get(key)
+                if df is not None:
+                    num_records = len(df)
+                    features = df[_FEATURE_COLS_LIST].to_numpy().T
+                else:
+                    experiment = self._get_experiment(session, experiment_id)
+                    num_records = PlateRepository(session).count_by_plate_id(plate_id)
+                    if not num_records:
+                        raise ValueError(f"No data found for plate {plate_id}")
+                    features = self._feature_block(experiment, num_records)
+                
+                summary = {
+                    'num_records': num_records,
+                    'num_features': 16,
+                    'plate_id': plate_id,
+                    'experiment_id': experiment_id,
+                    'feature_columns': list(FEATURE_COLS),
+                    'shape': (num_records, len(FEATURE_COLS) + len(METADATA_COLS)),
+                    'feature_stats': self._describe(features, FEATURE_COLS)
+                }
+                self._cache_put(self._summary_cache, key, summary)
+            else:
+                self._summary_cache.move_to_end(key)
+        return copy.deepcopy(summary)
 
 
 def main():
@@ -132,11 +408,13 @@ def main():
     import sys
     
     if len(sys.argv) < 3:
-        print("Usage: python -m src.services.feature_extractor <experiment_id> <plate_id>")
+        print("Usage: python -m src.services.feature_extractor <experiment_id> <plate_id> [output_file]")
+        print("An output_file ending in .gz is gzip-compressed")
         sys.exit(1)
     
     experiment_id = int(sys.argv[1])
     plate_id = int(sys.argv[2])
+    output_file = sys.argv[3] if len(sys.argv) > 3 else f"features_exp{experiment_id}_plate{plate_id}.csv"
     
     extractor = FeatureExtractor()
     
@@ -160,9 +438,9 @@ def main():
     print(f"Number of records: {summary['num_records']}")
     print(f"Number of features: {summary['num_features']}")
     
-    # Optionally save to CSV
-    output_file = f"features_exp{experiment_id}_plate{plate_id}.csv"
-    df.to_csv(output_file, index=False)
+    # Save to CSV, serializing 50k rows at a time to bound the text buffer
+    # Compression is inferred from the file extension, e.g. .csv.gz
+    df.to_csv(output_file, index=False, chunksize=50_000)
     print(f"\nSaved features to: {output_file}")
 
 
@@ -0,0 +1,181 @@
+import contextlib
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import create_engine, func, select
+
+from src.models import Base
+from src.models.plate import Plate
+from src.models.plate_ingest import PlateIngest
+from src.services.absorbance_etl import AbsorbanceETL
+
+
+def write_plate_csv(path: Path, rows: list[list[str]], header: list[str] = ("", "A1", "A2", "B1")) -> Path:
+    """Write a plate CSV: a header of well identifiers, then one line per time point"""
+    path.write_text("\n".join(",".join(row) for row in [list(header), *rows]) + "\n")
+    return path
+
+
+class PlateParserTest(unittest.TestCase):
+    """Edge cases of the CSV plate parser"""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp_dir.name)
+        self.etl = AbsorbanceETL(f"sqlite:///{self.tmp_path / 'test.db'}")
+    
+    def tearDown(self):
+        self.etl.engine.dispose()
+        self.tmp_dir.cleanup()
+    
+    def assertColumns(self, plate_data: dict, plate_id: int, row_id, column_id, value, seconds_time_sample):
+        self.assertEqual(plate_data['plate_id'], plate_id)
+        np.testing.assert_array_equal(plate_data['row_id'], row_id)
+        np.testing.assert_array_equal(plate_data['column_id'], column_id)
+        np.testing.assert_array_equal(plate_data['value'], value)
+        np.testing.assert_array_equal(plate_data['seconds_time_sample'], seconds_time_sample)
+        self.assertEqual(plate_data['row_id'].dtype, np.int64)
+        self.assertEqual(plate_data['column_id'].dtype, np.int64)
+        self.assertEqual(plate_data['value'].dtype, np.float64)
+        self.assertEqual(plate_data['seconds_time_sample'].dtype, np.int64)
+    
+    def test_well_identifier_row_is_ordinal(self):
+        self.assertEqual(AbsorbanceETL.parse_well_identifier("A1"), (0, 1))
+        self.assertEqual(AbsorbanceETL.parse_well_identifier("B3"), (1, 3))
+        self.assertEqual(AbsorbanceETL.parse_well_identifier("H12"), (7, 12))
+        with self.assertRaises(ValueError):
+            AbsorbanceETL.parse_well_identifier("Z9")
+    
+    def test_plate_id_from_filename(self):
+        self.assertEqual(AbsorbanceETL.parse_plate_id_from_filename("plate_12_abs.csv"), 12)
+        self.assertIsNone(AbsorbanceETL.parse_plate_id_from_filename("absorbance.csv"))
+    
+    def test_values_are_time_then_well_ordered(self):
+        path = write_plate_csv(self.tmp_path / "plate_3_abs.csv", [["0", "0.1", "0.2", "0.3"], ["60.0", "0.4", "0.5", "0.6"]])
+        self.assertColumns(
+            self.etl.parse_csv_file(path), 3,
+            row_id=[0, 0, 1, 0, 0, 1],
+            column_id=[1, 2, 1, 1, 2, 1],
+            value=[0.1, 0.2, 0.3, 0.4, 0.5, 0.6],
+            seconds_time_sample=[0, 0, 0, 60, 60, 60]
+        )
+    
+    def test_invalid_wells_short_rows_and_missing_cells_are_skipped(self):
+        path = write_plate_csv(
+            self.tmp_path / "plate_4_abs.csv",
+            [["0", "0.1", "0.2", "0.3", "9", ""], [""], ["", "1", "1", "1"], ["60", "0.4", "", "0.6"], ["120", " 0.7 "]],
+            header=["", "A1", "A2", "B1", "Z9", ""]
+        )
+        self.assertColumns(
+            self.etl.parse_csv_file(path), 4,
+            row_id=[0, 0, 1, 0, 1, 0],
+            column_id=[1, 2, 1, 1, 1, 1],
+            value=[0.1, 0.2, 0.3, 0.4, 0.6, 0.7],
+            seconds_time_sample=[0, 0, 0, 60, 60, 120]
+        )
+    
+    def test_text_cells_are_skipped_with_a_warning(self):
+        path = write_plate_csv(self.tmp_path / "plate_5_abs.csv", [["0", "0.1", "abc", "nan"], ["60", "0.4", "1e-3", "inf"]])
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            plate_data = self.etl.parse_csv_file(path)
+        
+        self.assertIn("Skipping non-numeric value at time 0, well A2: abc", output.getvalue())
+        self.assertColumns(
+            plate_data, 5,
+            row_id=[0, 0, 0, 1],
+            column_id=[1, 1, 2, 1],
+            value=[0.1, 0.4, 0.001, np.inf],
+            seconds_time_sample=[0, 60, 60, 60]
+        )
+    
+    def test_reading_stops_at_footer(self):
+        path = write_plate_csv(
+            self.tmp_path / "plate_6_abs.csv",
+            [["0", "0.1", "0.2", "0.3"], ["End", "", "", ""], ["60", "1", "1", "1"]]
+        )
+        self.assertColumns(
+            self.etl.parse_csv_file(path), 6,
+            row_id=[0, 0, 1],
+            column_id=[1, 2, 1],
+            value=[0.1, 0.2, 0.3],
+            seconds_time_sample=[0, 0, 0]
+        )
+    
+    def test_header_only_file_is_rejected(self):
+        path = write_plate_csv(self.tmp_path / "plate_7_abs.csv", [])
+        with self.assertRaisesRegex(ValueError, "fewer than 2 rows"):
+            self.etl.parse_csv_file(path)
+    
+    def test_file_without_data_rows_parses_to_empty_columns(self):
+        path = write_plate_csv(self.tmp_path / "plate_8_abs.csv", [["End", "1", "1", "1"]])
+        self.assertColumns(self.etl.parse_csv_file(path), 8, row_id=[], column_id=[], value=[], seconds_time_sample=[])
+    
+    def test_chunks_split_on_time_points(self):
+        rows = [[str(60 * t), f"{t}.1", "", f"{t}.3"] for t in range(5)]
+        path = write_plate_csv(self.tmp_path / "plate_9_abs.csv", rows)
+        whole = self.etl.parse_csv_file(path)
+        
+        chunks = list(self.etl.iter_plate_chunks(path, chunk_rows=2))
+        self.assertEqual([len(np.unique(chunk['seconds_time_sample'])) for chunk in chunks], [2, 2, 1])
+        for key in ('row_id', 'column_id', 'value', 'seconds_time_sample'):
+            np.testing.assert_array_equal(np.concatenate([chunk[key] for chunk in chunks]), whole[key])
+        self.assertEqual(len(whole['value']), 10)
+
+
+class IngestDirectoryTransactionTest(unittest.TestCase):
+    """A directory ingest is one transaction: nothing persists if it is rolled back"""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = Path(self.tmp_dir.name)
+        self.database_url = f"sqlite:///{self.tmp_path / 'test.db'}"
+        self.engine = create_engine(self.database_url)
+        Base.metadata.create_all(self.engine)
+        
+        self.plate_dir = self.tmp_path / "plates"
+        self.plate_dir.mkdir()
+        for plate_id in (1, 2, 3):
+            write_plate_csv(self.plate_dir / f"plate_{plate_id}_abs.csv", [["0", "0.1", "0.2", "0.3"], ["60", "0.4", "0.5", "0.6"]])
+        
+        self.etl = AbsorbanceETL(self.database_url, max_workers=1)
+    
+    def tearDown(self):
+        self.etl.engine.dispose()
+        self.engine.dispose()
+        self.tmp_dir.cleanup()
+    
+    def _count(self, model) -> int:
+        with self.engine.connect() as conn:
+            return conn.scalar(select(func.count()).select_from(model))
+    
+    def test_ingest_directory_commits_all_files(self):
+        self.assertEqual(self.etl.ingest_directory(self.plate_dir), 18)
+        self.assertEqual(self._count(Plate), 18)
+        self.assertEqual(self._count(PlateIngest), 3)
+    
+    def test_failed_commit_persists_nothing(self):
+        session_factory = self.etl.SessionLocal
+        
+        def failing_session():
+            session = session_factory()
+            def commit():
+                raise RuntimeError("commit failed")
+            session.commit = commit
+            return session
+        
+        self.etl.SessionLocal = failing_session
+        with self.assertRaisesRegex(RuntimeError, "commit failed"):
+            self.etl.ingest_directory(self.plate_dir)
+        
+        # Every file was inserted in its own savepoint; rolling back the outer
+        # transaction must discard all of them
+        self.assertEqual(self._count(Plate), 0)
+        self.assertEqual(self._count(PlateIngest), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
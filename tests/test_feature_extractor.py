@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.models import Base
+from src.repositories.experiment_repository import ExperimentRepository
+from src.repositories.plate_ingest_repository import PlateIngestRepository
+from src.repositories.plate_repository import PlateRepository
+from src.repositories.reagent_value_repository import ReagentValueRepository
+from src.services.feature_extractor import FeatureExtractor
+
+
+class FeatureExtractorCacheTest(unittest.TestCase):
+    """Cached features must not outlive the data they were built from"""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.database_url = f"sqlite:///{os.path.join(self.tmp_dir.name, 'test.db')}"
+        self.engine = create_engine(self.database_url)
+        Base.metadata.create_all(self.engine)
+        
+        with Session(self.engine) as session:
+            self.experiment_id = self._create_experiment(session, dilution=2.0)
+            self._ingest_plate(session, plate_id=2, value=0.5)
+        
+        self.extractor = FeatureExtractor(self.database_url)
+    
+    def tearDown(self):
+        self.extractor.engine.dispose()
+        self.engine.dispose()
+        self.tmp_dir.cleanup()
+    
+    @staticmethod
+    def _create_experiment(session: Session, dilution: float) -> int:
+        experiment = ExperimentRepository(session).create(cell_concentration=10.0, dilution=dilution)
+        ReagentValueRepository(session).bulk_create([
+            {'experiment_id': experiment.id, 'reagent_id': reagent_id, 'value': float(reagent_id), 'unit': 'mM'}
+            for reagent_id in range(1, 4)
+        ])
+        return experiment.id
+    
+    @staticmethod
+    def _ingest_plate(session: Session, plate_id: int, value: float, num_times: int = 3) -> None:
+        num_records = PlateRepository(session).bulk_create([
+            {
+                'plate_id': plate_id,
+                'row_id': 0,
+                'column_id': column_id,
+                'value': value,
+                'seconds_time_sample': seconds
+            }
+            for seconds in range(num_times)
+            for column_id in range(1, 4)
+        ])
+        PlateIngestRepository(session).create(plate_id=plate_id, file_name=f"plate_{plate_id}_abs.csv", num_records=num_records)
+    
+    def test_deleted_plate_is_not_served_from_cache(self):
+        self.assertEqual(len(self.extractor.get_features_dataframe(self.experiment_id, 2)), 9)
+        self.assertEqual(self.extractor.get_features_summary(self.experiment_id, 2)['num_records'], 9)
+        
+        with Session(self.engine) as session:
+            PlateRepository(session).delete_by_plate_id(2)
+        
+        with self.assertRaisesRegex(ValueError, "No data found for plate 2"):
+            self.extractor.get_features_dataframe(self.experiment_id, 2)
+        with self.assertRaisesRegex(ValueError, "No data found for plate 2"):
+            self.extractor.get_features_summary(self.experiment_id, 2)
+    
+    def test_replaced_plate_data_is_rebuilt(self):
+        self.extractor.get_features_dataframe(self.experiment_id, 2)
+        
+        # The deleted rows were the highest IDs, so SQLite hands the same IDs out again
+        with Session(self.engine) as session:
+            PlateRepository(session).delete_by_plate_id(2)
+            self._ingest_plate(session, plate_id=2, value=0.75)
+        
+        df = self.extractor.get_features_dataframe(self.experiment_id, 2, high_precision=True)
+        self.assertEqual(df['absorbance'].tolist(), [0.75] * 9)
+    
+    def test_deleted_and_recreated_experiment_is_rebuilt(self):
+        self.extractor.get_features_dataframe(self.experiment_id, 2)
+        
+        with Session(self.engine) as session:
+            ReagentValueRepository(session).delete_by_experiment_id(self.experiment_id)
+            ExperimentRepository(session).delete(self.experiment_id)
+        
+        with self.assertRaisesRegex(ValueError, f"Experiment {self.experiment_id} not found"):
+            self.extractor.get_features_dataframe(self.experiment_id, 2)
+        
+        # SQLite reuses the deleted experiment's ID
+        with Session(self.engine) as session:
+            experiment_id = self._create_experiment(session, dilution=4.0)
+        self.assertEqual(experiment_id, self.experiment_id)
+        
+        df = self.extractor.get_features_dataframe(experiment_id, 2, high_precision=True)
+        self.assertEqual(df['feature_16'].iloc[0], 10.0 / 4.0)
+
+
+if __name__ == "__main__":
+    unittest.main()